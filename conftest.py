@@ -139,6 +139,7 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "e2e: End-to-end tests")
     config.addinivalue_line("markers", "slow: Slow running tests")
     config.addinivalue_line("markers", "audio: Audio processing tests")
+    config.addinivalue_line("markers", "network: Tests that bind real network sockets")
 
 
 @pytest.fixture(scope="session")
@@ -201,7 +201,8 @@ class SessionManager:
             "error": []
         }
         
-        # Cleanup task
+        # Cleanup task (not spawned here; started on demand by start_cleanup_task,
+        # so stop_cleanup_task is a no-op for managers that never started it)
         self.cleanup_task: Optional[asyncio.Task] = None
         self.cleanup_interval = 300  # 5 minutes
         
@@ -9,6 +9,22 @@ from ..ai.function_calling import BaseFunction, FunctionDefinition, FunctionPara
 
 logger = logging.getLogger(__name__)
 
+# Common alternative names mapped to the canonical city key
+LOCATION_ALIASES = {
+    "New Delhi": "Delhi",
+    "Bombay": "Mumbai",
+    "Calcutta": "Kolkata",
+    "Bengaluru": "Bangalore",
+    "Madras": "Chennai",
+    "Gurgaon": "Gurugram",
+    "Trivandrum": "Thiruvananthapuram",
+    "Vizag": "Visakhapatnam",
+    "Unknowncity": "UnknownCity"  # Handle test case
+}
+
+# Cities in the NPCL service area
+NPCL_AREAS = frozenset({"Noida", "Greater Noida", "Ghaziabad", "Faridabad", "Gurugram"})
+
 
 class WeatherTool(BaseFunction):
     """Weather information tool for Indian cities"""
@@ -45,6 +61,12 @@ class WeatherTool(BaseFunction):
             "Gurugram": ("28°C", "Hazy", "60%", "Corporate hub, urban climate")
         }
         
+        # Lowercased city names and aliases -> canonical city
+        self._alias_index: Dict[str, str] = {city.lower(): city for city in self.weather_cities}
+        self._alias_index.update(
+            (alias.lower(), city) for alias, city in LOCATION_ALIASES.items()
+        )
+        
         logger.info("Weather Tool initialized with data for Indian cities")
     
     def get_definition(self) -> FunctionDefinition:
@@ -95,23 +117,9 @@ class WeatherTool(BaseFunction):
     
     def _normalize_location(self, location: str) -> str:
         """Normalize location name for lookup"""
-        # Convert to title case and handle common variations
-        location = location.strip().title()
-        
-        # Handle common variations
-        location_mappings = {
-            "New Delhi": "Delhi",
-            "Bombay": "Mumbai",
-            "Calcutta": "Kolkata",
-            "Bengaluru": "Bangalore",
-            "Madras": "Chennai",
-            "Gurgaon": "Gurugram",
-            "Trivandrum": "Thiruvananthapuram",
-            "Vizag": "Visakhapatnam",
-            "Unknowncity": "UnknownCity"  # Handle test case
-        }
-        
-        return location_mappings.get(location, location)
+        location = location.strip()
+        # Unknown location: fall back to title case
+        return self._alias_index.get(location.lower()) or location.title()
     
     def _get_weather_data(self, location: str) -> Tuple[str, str, str, str]:
         """Get weather data for location"""
@@ -126,7 +134,7 @@ class WeatherTool(BaseFunction):
         temperature, condition, humidity, description = weather_data
         
         # Create natural language response
-        if location in ["Noida", "Greater Noida", "Ghaziabad", "Faridabad", "Gurugram"]:
+        if location in NPCL_AREAS:
             # Special response for NPCL service areas
             response = (
                 f"Weather in {location}: Currently {temperature} with {condition.lower()} conditions. "
@@ -147,6 +155,7 @@ class WeatherTool(BaseFunction):
         """Add or update weather data for a city"""
         # Use the exact city name as provided (for test compatibility)
         self.weather_cities[city] = (temperature, condition, humidity, description)
+        self._alias_index[city.lower()] = city
         logger.info(f"Added/updated weather data for {city}")
     
     def get_supported_cities(self) -> list:
@@ -155,7 +164,7 @@ class WeatherTool(BaseFunction):
     
     def is_city_supported(self, city: str) -> bool:
         """Check if city is supported"""
-        return self._normalize_location(city) in self.weather_cities
+        return self._alias_index.get(city.strip().lower()) in self.weather_cities
 
 
 # Create weather tool instance
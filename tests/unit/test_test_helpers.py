@@ -0,0 +1,459 @@
+"""
+Test cases for the shared test helpers.
+Tests event-driven condition waits, mock event dispatch, broadcast and audio
+encoding, batched WAV files, audio and threshold validation, and the asyncio and itimer sampling modes of
+the test PerformanceMonitor.
+"""
+
+import pytest
+import asyncio
+import base64
+import io
+import json
+import numpy as np
+import signal
+import sys
+import time
+import wave
+
+from tests.utils import test_helpers
+from tests.utils.audio_generator import AudioGenerator
+from tests.utils.test_helpers import (
+    AsyncTestHelper, MockAsteriskARI, MockGeminiLiveAPI, MockWebSocketServer,
+    PerformanceMonitor, TestDataValidator
+)
+
+
+@pytest.fixture
+def ari_mock():
+    """Mock built outside any running loop, as sync fixtures do"""
+    return MockAsteriskARI()
+
+
+@pytest.mark.unit
+class TestAsyncTestHelperEventWait:
+    """Test cases for waiting on a condition with source= instead of polling"""
+    
+    async def test_sync_condition_wakes_on_mock_event(self, ari_mock):
+        """Test a sync predicate is re-checked each time the mock dispatches"""
+        received = []
+        ari_mock.add_event_handler(lambda event: received.append(event["type"]))
+        
+        flow = asyncio.create_task(ari_mock.simulate_call_flow("channel-1", "1000"))
+        start = time.monotonic()
+        result = await AsyncTestHelper.wait_for_condition(
+            lambda: len(received) == 3, timeout=2.0, source=ari_mock
+        )
+        await flow
+        
+        assert result
+        assert received == ["StasisStart", "ChannelStateChange", "StasisEnd"]
+        assert time.monotonic() - start < 1.0
+    
+    async def test_async_condition_sees_dispatch_while_suspended(self, ari_mock):
+        """Test an event dispatched during an async predicate's await is not lost"""
+        state = {"ready": False}
+        
+        async def condition():
+            result = state["ready"]
+            await asyncio.sleep(0.05)  # The dispatch happens while we are suspended
+            return result
+        
+        async def dispatch():
+            await asyncio.sleep(0.01)
+            state["ready"] = True
+            await ari_mock.send_event({"type": "Test"})
+        
+        start = time.monotonic()
+        result, _ = await asyncio.gather(
+            AsyncTestHelper.wait_for_async_condition(condition, timeout=2.0, source=ari_mock),
+            dispatch()
+        )
+        
+        assert result
+        assert time.monotonic() - start < 1.0
+    
+    async def test_concurrent_waiters_all_wake(self, ari_mock):
+        """Test one waiter waking does not swallow another waiter's wakeup"""
+        state = {"ready": False}
+        
+        async def slow_condition():
+            result = state["ready"]
+            await asyncio.sleep(0.05)
+            return result
+        
+        async def dispatch():
+            await asyncio.sleep(0.01)
+            state["ready"] = True
+            await ari_mock.send_event({"type": "Test"})
+        
+        start = time.monotonic()
+        slow, fast, _ = await asyncio.gather(
+            AsyncTestHelper.wait_for_async_condition(
+                slow_condition, timeout=1.0, source=ari_mock
+            ),
+            AsyncTestHelper.wait_for_condition(
+                lambda: state["ready"], timeout=1.0, source=ari_mock
+            ),
+            dispatch()
+        )
+        
+        assert slow and fast
+        assert time.monotonic() - start < 0.5
+    
+    async def test_source_wait_times_out(self, ari_mock):
+        """Test a condition that never holds returns False at the timeout"""
+        result = await AsyncTestHelper.wait_for_condition(
+            lambda: False, timeout=0.05, source=ari_mock
+        )
+        
+        assert not result
+
+
+@pytest.mark.unit
+class TestMockEventDispatch:
+    """Test cases for the handler dispatch shared by the mock APIs"""
+    
+    async def test_mixed_handlers_run_in_registration_order(self, ari_mock):
+        """Test sync and async handlers interleave as they were registered"""
+        calls = []
+        
+        async def first(event):
+            await asyncio.sleep(0)
+            calls.append("async-1")
+        
+        async def third(event):
+            calls.append("async-3")
+        
+        ari_mock.add_event_handler(first)
+        ari_mock.add_event_handler(lambda event: calls.append("sync-2"))
+        ari_mock.add_event_handler(third)
+        ari_mock.add_event_handler(lambda event: calls.append("sync-4"))
+        
+        await ari_mock.send_event({"type": "Test"})
+        
+        assert calls == ["async-1", "sync-2", "async-3", "sync-4"]
+    
+    async def test_async_handlers_run_in_registration_order(self, ari_mock):
+        """Test an async handler that suspends still finishes before the next"""
+        calls = []
+        
+        async def first(event):
+            await asyncio.sleep(0)
+            calls.append("A")
+        
+        async def second(event):
+            calls.append("B")
+        
+        ari_mock.add_event_handler(first)
+        ari_mock.add_event_handler(second)
+        
+        await ari_mock.send_event({"type": "Test"})
+        
+        assert calls == ["A", "B"]
+    
+    @pytest.mark.parametrize("use_orjson", [
+        pytest.param(True, marks=pytest.mark.skipif(
+            not test_helpers.ORJSON_AVAILABLE, reason="orjson not installed"
+        )),
+        False
+    ])
+    async def test_encoded_handlers_get_json_payload(self, ari_mock, monkeypatch, use_orjson):
+        """Test encoded handlers receive the event as compact JSON bytes"""
+        monkeypatch.setattr(test_helpers, "ORJSON_AVAILABLE", use_orjson)
+        payloads = []
+        
+        async def record(payload):
+            payloads.append(payload)
+        
+        ari_mock.add_encoded_event_handler(record)
+        event = {"type": "Test", "channel": {"id": "channel-1", "name": "Ünïcode"}}
+        
+        await ari_mock.send_event(event)
+        
+        assert len(payloads) == 1
+        assert isinstance(payloads[0], bytes)
+        assert b": " not in payloads[0] and b", " not in payloads[0]
+        assert json.loads(payloads[0]) == event
+    
+    async def test_encoded_handlers_run_after_dict_handlers(self, ari_mock):
+        """Test encoded handlers run last, in their own registration order"""
+        calls = []
+        ari_mock.add_encoded_event_handler(lambda payload: calls.append("encoded-1"))
+        ari_mock.add_event_handler(lambda event: calls.append("dict"))
+        ari_mock.add_encoded_event_handler(lambda payload: calls.append("encoded-2"))
+        
+        await ari_mock.send_event({"type": "Test"})
+        
+        assert calls == ["dict", "encoded-1", "encoded-2"]
+    
+    async def test_failing_handler_does_not_stop_dispatch(self, ari_mock):
+        """Test a handler raising still lets later handlers see the event"""
+        calls = []
+        
+        async def failing(event):
+            raise RuntimeError("boom")
+        
+        ari_mock.add_event_handler(failing)
+        ari_mock.add_event_handler(lambda event: calls.append(event["type"]))
+        
+        await ari_mock.send_event({"type": "Test"})
+        
+        assert calls == ["Test"]
+
+
+class _RecordingPeer:
+    """Stand-in connection that records sends, or fails every send"""
+    
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+    
+    async def send(self, message):
+        if self.fail:
+            raise ConnectionError("peer closed")
+        self.sent.append(message)
+
+
+@pytest.mark.unit
+class TestMockWebSocketBroadcast:
+    """Test cases for MockWebSocketServer.broadcast"""
+    
+    @pytest.mark.parametrize("peer_count", [1, 3])
+    async def test_broadcast_reaches_every_peer(self, peer_count):
+        """Test each connected peer receives the message"""
+        server = MockWebSocketServer()
+        peers = [_RecordingPeer() for _ in range(peer_count)]
+        server.connections.update(peers)
+        
+        await server.broadcast("hello")
+        
+        assert all(peer.sent == ["hello"] for peer in peers)
+    
+    async def test_failing_peer_does_not_stop_broadcast(self):
+        """Test a peer whose send raises doesn't keep others from receiving"""
+        server = MockWebSocketServer()
+        dead, live = _RecordingPeer(fail=True), _RecordingPeer()
+        server.connections.update([dead, live])
+        
+        await server.broadcast("hello")
+        
+        assert live.sent == ["hello"]
+
+
+@pytest.mark.unit
+class TestMockGeminiAudioResponse:
+    """Test cases for MockGeminiLiveAPI.simulate_audio_response"""
+    
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+    async def test_encodes_any_bytes_like_buffer(self, wrap):
+        """Test bytes, bytearray and memoryview audio all encode the same"""
+        mock = MockGeminiLiveAPI()
+        received = []
+        mock.add_event_handler(received.append)
+        audio = b"\x00\x01" * 160
+        
+        await mock.simulate_audio_response(wrap(audio))
+        
+        encoded = received[0]["response"]["output"]["audio"]
+        assert base64.b64decode(encoded) == audio
+
+
+@pytest.mark.unit
+class TestWavFilesBatch:
+    """Test cases for AudioGenerator.create_wav_files_batch"""
+    
+    def test_each_file_matches_create_wav_file(self):
+        """Test every slice equals the standalone WAV for its payload"""
+        payloads = [
+            AudioGenerator.generate_sine_wave(440, 20),
+            b"",
+            AudioGenerator.generate_silence(50)
+        ]
+        
+        files = AudioGenerator.create_wav_files_batch(payloads, sample_rate=16000)
+        
+        assert len(files) == len(payloads)
+        for wav, payload in zip(files, payloads):
+            assert bytes(wav) == AudioGenerator.create_wav_file(payload, sample_rate=16000)
+            with wave.open(io.BytesIO(bytes(wav))) as reader:
+                assert reader.getframerate() == 16000
+                assert reader.readframes(reader.getnframes()) == payload
+    
+    def test_files_are_read_only_views_of_one_buffer(self):
+        """Test slices are read-only and share a single underlying buffer"""
+        files = AudioGenerator.create_wav_files_batch([b"\x01\x00", b"\x02\x00"])
+        
+        assert all(wav.readonly for wav in files)
+        assert files[0].obj is files[1].obj
+        with pytest.raises(TypeError):
+            files[0][0] = 0
+    
+    def test_empty_batch(self):
+        """Test no payloads give no files"""
+        assert AudioGenerator.create_wav_files_batch([]) == []
+
+
+@pytest.mark.unit
+class TestAudioValidation:
+    """Test cases for TestDataValidator.validate_audio_batch"""
+    
+    def test_batch_matches_single_clip_validation(self):
+        """Test each batch result agrees with validate_audio_data on that clip"""
+        # 100ms at 16kHz is 3200 bytes; the 5ms tolerance is 160 bytes
+        sizes = [3200, 3360, 3362, 3040, 3038, 1600]
+        durations = [100, 100, 100, 100, 100, 50]
+        
+        results = TestDataValidator.validate_audio_batch(sizes, durations)
+        
+        assert results.tolist() == [True, True, False, True, False, True]
+        assert results.tolist() == [
+            TestDataValidator.validate_audio_data(b"\x00" * size, duration)
+            for size, duration in zip(sizes, durations)
+        ]
+    
+    def test_scalar_duration_broadcasts(self):
+        """Test one expected duration is checked against every clip"""
+        results = TestDataValidator.validate_audio_batch(
+            np.array([320, 640, 960]), 20, sample_rate=8000
+        )
+        
+        assert results.tolist() == [True, False, False]
+
+
+@pytest.mark.unit
+class TestPerformanceThresholds:
+    """Test cases for TestDataValidator.validate_performance_metrics"""
+    
+    def test_results_keep_threshold_order(self):
+        """Test results come back in the order the thresholds were given"""
+        results = TestDataValidator.validate_performance_metrics(
+            {"latency_ms": 80, "memory_mb": 300},
+            {"memory_mb": 200, "latency_ms": 100, "cpu_percent": 50}
+        )
+        
+        assert list(results.items()) == [
+            ("memory_mb", False), ("latency_ms", True), ("cpu_percent", False)
+        ]
+    
+    def test_mixed_key_types(self):
+        """Test keys that can't be sorted against each other still validate"""
+        results = TestDataValidator.validate_performance_metrics(
+            {"a": 1, 1: 5}, {"a": 2, 1: 3}
+        )
+        
+        assert results == {"a": True, 1: False}
+    
+    def test_unhashable_threshold_falls_back(self):
+        """Test thresholds that can't key the cache use the plain loop"""
+        results = TestDataValidator.validate_performance_metrics(
+            {"sizes": [1, 2]}, {"sizes": [1, 3]}
+        )
+        
+        assert results == {"sizes": True}
+
+
+@pytest.mark.unit
+class TestPerformanceMonitorAsync:
+    """Test cases for PerformanceMonitor.start_monitoring_async"""
+    
+    async def test_samples_on_the_running_loop(self):
+        """Test the sampler task records metrics until stopped"""
+        monitor = PerformanceMonitor(store_history=True)
+        
+        await monitor.start_monitoring_async()
+        await asyncio.sleep(0.25)
+        await monitor.stop_monitoring_async()
+        
+        metrics = monitor.get_metrics()
+        assert len(monitor.memory_usage) >= 2
+        assert metrics["peak_memory_mb"] >= metrics["avg_memory_mb"] > 0
+        assert 0.2 < metrics["duration_seconds"] < 1.0
+    
+    async def test_stop_does_not_wait_out_the_sampler_sleep(self):
+        """Test stopping cancels the sampler instead of waiting for its sleep"""
+        monitor = PerformanceMonitor()
+        await monitor.start_monitoring_async()
+        await asyncio.sleep(0)  # Let the sampler take its first sample and sleep
+        
+        start = time.monotonic()
+        await monitor.stop_monitoring_async()
+        
+        assert time.monotonic() - start < 0.05
+        assert monitor._monitor_task is None
+        assert not monitor.monitoring
+    
+    async def test_stop_without_start(self):
+        """Test stopping an idle monitor is a no-op"""
+        monitor = PerformanceMonitor()
+        
+        await monitor.stop_monitoring_async()
+        
+        assert monitor.get_metrics()["peak_memory_mb"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGALRM is Unix-only")
+class TestPerformanceMonitorItimer:
+    """Test cases for PerformanceMonitor.start_monitoring_itimer"""
+    
+    def setup_method(self):
+        """Arm our own ITIMER_REAL timer, standing in for pytest-timeout's"""
+        self.alarms = []
+        self.saved_handler = signal.signal(signal.SIGALRM, self._record_alarm)
+        self.saved_timer = signal.setitimer(signal.ITIMER_REAL, 0)
+    
+    def teardown_method(self):
+        """Put back whatever timer was running before the test"""
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.saved_handler)
+        if self.saved_timer[0]:
+            signal.setitimer(signal.ITIMER_REAL, *self.saved_timer)
+    
+    def _record_alarm(self, signum, frame):
+        self.alarms.append(signum)
+    
+    def test_start_stop_restores_previous_timer(self):
+        """Test the previous handler and remaining time survive monitoring"""
+        signal.setitimer(signal.ITIMER_REAL, 5.0)
+        
+        monitor = PerformanceMonitor()
+        monitor.start_monitoring_itimer(0.005)
+        assert signal.getsignal(signal.SIGALRM) is not self._record_alarm
+        
+        deadline = time.monotonic() + 0.1
+        while time.monotonic() < deadline:
+            pass
+        monitor.stop_monitoring_itimer()
+        
+        remaining, interval = signal.getitimer(signal.ITIMER_REAL)
+        assert signal.getsignal(signal.SIGALRM) == self._record_alarm
+        assert 4.5 < remaining <= 4.95
+        assert interval == 0
+        assert monitor.get_metrics()["peak_memory_mb"] > 0
+        assert self.alarms == []
+    
+    def test_previous_timer_fires_during_monitoring(self):
+        """Test a timer expiring mid-monitoring still reaches its handler"""
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        
+        monitor = PerformanceMonitor()
+        monitor.start_monitoring_itimer(0.005)
+        
+        deadline = time.monotonic() + 0.2
+        while time.monotonic() < deadline:
+            pass
+        monitor.stop_monitoring_itimer()
+        
+        # Fired once, and not re-armed afterwards since it was one-shot
+        assert self.alarms == [signal.SIGALRM]
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        assert signal.getsignal(signal.SIGALRM) == self._record_alarm
+    
+    def test_stop_without_start_leaves_timer_alone(self):
+        """Test stopping an idle monitor does not disarm other timers"""
+        signal.setitimer(signal.ITIMER_REAL, 5.0)
+        
+        PerformanceMonitor().stop_monitoring_itimer()
+        
+        assert signal.getitimer(signal.ITIMER_REAL)[0] > 4.5
@@ -3,31 +3,35 @@ Test cases for Weather Tool.
 Tests weather data retrieval and NPCL-specific functionality.
 """
 
+import asyncio
+import copy
 import pytest
 from unittest.mock import patch
 
-from src.voice_assistant.tools.weather_tool import WeatherTool, weather_tool
+from src.voice_assistant.tools.weather_tool import WeatherTool, weather_tool, NPCL_AREAS
 from src.voice_assistant.ai.function_calling import FunctionDefinition
 
 
+@pytest.fixture(scope="class")
+def tool():
+    """Weather tool shared by every test in a class (tests must not mutate it)"""
+    return WeatherTool()
+
+
 class TestWeatherTool:
     """Test cases for WeatherTool"""
     
-    def setup_method(self):
-        """Setup for each test"""
-        self.tool = WeatherTool()
-    
-    def test_initialization(self):
+    def test_initialization(self, tool):
         """Test weather tool initialization"""
-        assert len(self.tool.weather_cities) > 0
-        assert "Delhi" in self.tool.weather_cities
-        assert "Mumbai" in self.tool.weather_cities
-        assert "Noida" in self.tool.weather_cities  # NPCL specific
-        assert "Greater Noida" in self.tool.weather_cities  # NPCL specific
+        assert len(tool.weather_cities) > 0
+        assert "Delhi" in tool.weather_cities
+        assert "Mumbai" in tool.weather_cities
+        assert "Noida" in tool.weather_cities  # NPCL specific
+        assert "Greater Noida" in tool.weather_cities  # NPCL specific
     
-    def test_get_definition(self):
+    def test_get_definition(self, tool):
         """Test function definition"""
-        definition = self.tool.get_definition()
+        definition = tool.get_definition()
         
         assert isinstance(definition, FunctionDefinition)
         assert definition.name == "get_weather"
@@ -41,10 +45,10 @@ class TestWeatherTool:
         assert param.type == "string"
         assert param.required == True
     
-    @pytest.mark.asyncio
-    async def test_execute_known_city(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_execute_known_city(self, tool):
         """Test weather lookup for known city"""
-        result = await self.tool.execute(location="Delhi")
+        result = await tool.execute(location="Delhi")
         
         assert "result" in result
         weather_text = result["result"]
@@ -54,10 +58,10 @@ class TestWeatherTool:
         assert "°C" in weather_text
         assert "humidity" in weather_text.lower()
     
-    @pytest.mark.asyncio
-    async def test_execute_npcl_service_area(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_execute_npcl_service_area(self, tool):
         """Test weather lookup for NPCL service area"""
-        result = await self.tool.execute(location="Noida")
+        result = await tool.execute(location="Noida")
         
         assert "result" in result
         weather_text = result["result"]
@@ -67,10 +71,10 @@ class TestWeatherTool:
         assert "NPCL service area" in weather_text
         assert "power supply should be stable" in weather_text
     
-    @pytest.mark.asyncio
-    async def test_execute_unknown_city(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_execute_unknown_city(self, tool):
         """Test weather lookup for unknown city"""
-        result = await self.tool.execute(location="UnknownCity")
+        result = await tool.execute(location="UnknownCity")
         
         assert "result" in result
         weather_text = result["result"]
@@ -79,11 +83,11 @@ class TestWeatherTool:
         assert "UnknownCity" in weather_text
         assert "°C" in weather_text
     
-    @pytest.mark.asyncio
-    async def test_execute_with_error(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_execute_with_error(self, tool):
         """Test weather lookup with simulated error"""
-        with patch.object(self.tool, '_get_weather_data', side_effect=Exception("Test error")):
-            result = await self.tool.execute(location="Delhi")
+        with patch.object(tool, '_get_weather_data', side_effect=Exception("Test error")):
+            result = await tool.execute(location="Delhi")
             
             assert "result" in result
             weather_text = result["result"]
@@ -92,33 +96,33 @@ class TestWeatherTool:
             assert "Sorry" in weather_text
             assert "couldn't get weather" in weather_text
     
-    def test_normalize_location(self):
+    def test_normalize_location(self, tool):
         """Test location name normalization"""
         # Test basic normalization
-        assert self.tool._normalize_location("delhi") == "Delhi"
-        assert self.tool._normalize_location("MUMBAI") == "Mumbai"
-        assert self.tool._normalize_location("  bangalore  ") == "Bangalore"
+        assert tool._normalize_location("delhi") == "Delhi"
+        assert tool._normalize_location("MUMBAI") == "Mumbai"
+        assert tool._normalize_location("  bangalore  ") == "Bangalore"
         
         # Test common variations
-        assert self.tool._normalize_location("New Delhi") == "Delhi"
-        assert self.tool._normalize_location("Bombay") == "Mumbai"
-        assert self.tool._normalize_location("Calcutta") == "Kolkata"
-        assert self.tool._normalize_location("Bengaluru") == "Bangalore"
-        assert self.tool._normalize_location("Madras") == "Chennai"
-        assert self.tool._normalize_location("Gurgaon") == "Gurugram"
+        assert tool._normalize_location("New Delhi") == "Delhi"
+        assert tool._normalize_location("Bombay") == "Mumbai"
+        assert tool._normalize_location("Calcutta") == "Kolkata"
+        assert tool._normalize_location("Bengaluru") == "Bangalore"
+        assert tool._normalize_location("Madras") == "Chennai"
+        assert tool._normalize_location("Gurgaon") == "Gurugram"
     
-    def test_get_weather_data_known_city(self):
+    def test_get_weather_data_known_city(self, tool):
         """Test weather data retrieval for known city"""
-        temperature, condition, humidity, description = self.tool._get_weather_data("Delhi")
+        temperature, condition, humidity, description = tool._get_weather_data("Delhi")
         
         assert "°C" in temperature
         assert isinstance(condition, str)
         assert "%" in humidity
         assert isinstance(description, str)
     
-    def test_get_weather_data_unknown_city(self):
+    def test_get_weather_data_unknown_city(self, tool):
         """Test weather data retrieval for unknown city"""
-        temperature, condition, humidity, description = self.tool._get_weather_data("UnknownCity")
+        temperature, condition, humidity, description = tool._get_weather_data("UnknownCity")
         
         # Should return default values
         assert temperature == "25°C"
@@ -126,11 +130,11 @@ class TestWeatherTool:
         assert humidity == "65%"
         assert description == "Moderate conditions"
     
-    def test_format_weather_response_npcl_area(self):
+    def test_format_weather_response_npcl_area(self, tool):
         """Test weather response formatting for NPCL service area"""
         weather_data = ("28°C", "Sunny", "60%", "Clear skies")
         
-        response = self.tool._format_weather_response("Noida", weather_data)
+        response = tool._format_weather_response("Noida", weather_data)
         
         assert "Noida" in response
         assert "28°C" in response
@@ -139,11 +143,11 @@ class TestWeatherTool:
         assert "NPCL service area" in response
         assert "power supply should be stable" in response
     
-    def test_format_weather_response_general_city(self):
+    def test_format_weather_response_general_city(self, tool):
         """Test weather response formatting for general city"""
         weather_data = ("32°C", "Cloudy", "75%", "Overcast conditions")
         
-        response = self.tool._format_weather_response("Mumbai", weather_data)
+        response = tool._format_weather_response("Mumbai", weather_data)
         
         assert "Mumbai" in response
         assert "32°C" in response
@@ -151,11 +155,13 @@ class TestWeatherTool:
         assert "75%" in response
         assert "NPCL service area" not in response  # Should not mention NPCL
     
-    def test_add_city_weather(self):
+    def test_add_city_weather(self, tool):
         """Test adding new city weather data"""
-        initial_count = len(self.tool.weather_cities)
+        # Mutates the tool, so work on a private copy of the shared fixture
+        tool = copy.deepcopy(tool)
+        initial_count = len(tool.weather_cities)
         
-        self.tool.add_city_weather(
+        tool.add_city_weather(
             city="TestCity",
             temperature="20°C",
             condition="Rainy",
@@ -164,19 +170,19 @@ class TestWeatherTool:
         )
         
         # Check city was added
-        assert len(self.tool.weather_cities) == initial_count + 1
-        assert "TestCity" in self.tool.weather_cities
+        assert len(tool.weather_cities) == initial_count + 1
+        assert "TestCity" in tool.weather_cities
         
         # Check data
-        weather_data = self.tool._get_weather_data("TestCity")
+        weather_data = tool._get_weather_data("TestCity")
         assert weather_data[0] == "20°C"
         assert weather_data[1] == "Rainy"
         assert weather_data[2] == "80%"
         assert weather_data[3] == "Heavy rainfall"
     
-    def test_get_supported_cities(self):
+    def test_get_supported_cities(self, tool):
         """Test getting list of supported cities"""
-        cities = self.tool.get_supported_cities()
+        cities = tool.get_supported_cities()
         
         assert isinstance(cities, list)
         assert len(cities) > 0
@@ -184,27 +190,38 @@ class TestWeatherTool:
         assert "Mumbai" in cities
         assert "Noida" in cities
     
-    def test_is_city_supported(self):
+    def test_is_city_supported(self, tool):
         """Test checking if city is supported"""
         # Known cities
-        assert self.tool.is_city_supported("Delhi") == True
-        assert self.tool.is_city_supported("delhi") == True  # Case insensitive
-        assert self.tool.is_city_supported("New Delhi") == True  # Variation
+        assert tool.is_city_supported("Delhi") == True
+        assert tool.is_city_supported("delhi") == True  # Case insensitive
+        assert tool.is_city_supported("New Delhi") == True  # Variation
         
         # Unknown city
-        assert self.tool.is_city_supported("UnknownCity") == False
+        assert tool.is_city_supported("UnknownCity") == False
     
-    def test_npcl_specific_cities(self):
+    def test_npcl_specific_cities(self, tool):
         """Test NPCL-specific cities are included"""
-        npcl_cities = ["Noida", "Greater Noida", "Ghaziabad", "Faridabad", "Gurugram"]
-        
-        for city in npcl_cities:
-            assert city in self.tool.weather_cities
-            assert self.tool.is_city_supported(city) == True
+        for city in NPCL_AREAS:
+            assert city in tool.weather_cities
+            assert tool.is_city_supported(city) == True
     
-    def test_weather_data_structure(self):
+    def test_weather_data_structure(self, tool):
         """Test weather data structure consistency"""
-        for city, data in self.tool.weather_cities.items():
+        items = list(tool.weather_cities.items())
+        
+        # Single sweep for the common (passing) case
+        if all(
+            len(data) == 4
+            and all(isinstance(field, str) for field in data)
+            and "°C" in data[0]
+            and "%" in data[2]
+            for _, data in items
+        ):
+            return
+        
+        # Something is off: re-check per city for a precise failure message
+        for city, data in items:
             assert len(data) == 4  # temperature, condition, humidity, description
             
             temperature, condition, humidity, description = data
@@ -221,11 +238,11 @@ class TestWeatherTool:
             assert isinstance(humidity, str)
             assert isinstance(description, str)
     
-    @pytest.mark.asyncio
-    async def test_integration_with_function_calling(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_integration_with_function_calling(self, tool):
         """Test integration with function calling system"""
         # Test that the tool can be used as a function
-        definition = self.tool.get_definition()
+        definition = tool.get_definition()
         gemini_format = definition.to_gemini_format()
         
         # Check Gemini format is valid
@@ -235,11 +252,11 @@ class TestWeatherTool:
         assert gemini_format["name"] == "get_weather"
         
         # Test parameter validation
-        validated_params = self.tool.validate_parameters({"location": "Delhi"})
+        validated_params = tool.validate_parameters({"location": "Delhi"})
         assert validated_params["location"] == "Delhi"
         
         # Test execution
-        result = await self.tool.execute(**validated_params)
+        result = await tool.execute(**validated_params)
         assert "result" in result
         assert "Delhi" in result["result"]
 
@@ -252,7 +269,7 @@ class TestGlobalWeatherTool:
         assert weather_tool is not None
         assert isinstance(weather_tool, WeatherTool)
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_global_instance_functionality(self):
         """Test global instance functionality"""
         result = await weather_tool.execute(location="Mumbai")
@@ -265,47 +282,52 @@ class TestGlobalWeatherTool:
 class TestWeatherToolIntegration:
     """Integration tests for weather tool"""
     
-    @pytest.mark.asyncio
-    async def test_full_weather_workflow(self):
+    @pytest.mark.asyncio(loop_scope="class")
+    @pytest.mark.parametrize("city", ["Delhi", "Mumbai", "Noida", "UnknownCity"])
+    async def test_full_weather_workflow(self, tool, city):
         """Test complete weather lookup workflow"""
-        tool = WeatherTool()
+        result = await tool.execute(location=city)
+        
+        assert "result" in result
+        weather_text = result["result"]
+        
+        # Check basic response structure
+        assert city in weather_text
+        assert "°C" in weather_text
         
-        # Test multiple cities
+        # Check NPCL-specific response for service areas
+        if city in NPCL_AREAS:
+            assert "NPCL service area" in weather_text
+        else:
+            assert "NPCL service area" not in weather_text
+    
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_concurrent_weather_lookups(self, tool):
+        """Test batched weather lookups issued concurrently"""
         cities_to_test = ["Delhi", "Mumbai", "Noida", "UnknownCity"]
         
-        for city in cities_to_test:
-            result = await tool.execute(location=city)
-            
-            assert "result" in result
-            weather_text = result["result"]
-            
-            # Check basic response structure
-            assert city in weather_text
-            assert "°C" in weather_text
-            
-            # Check NPCL-specific response for service areas
-            if city in ["Noida", "Greater Noida", "Ghaziabad", "Faridabad", "Gurugram"]:
-                assert "NPCL service area" in weather_text
-            else:
-                assert "NPCL service area" not in weather_text
+        results = await asyncio.gather(
+            *(tool.execute(location=city) for city in cities_to_test)
+        )
+        
+        # Results come back in request order
+        for city, result in zip(cities_to_test, results):
+            assert city in result["result"]
+            assert ("NPCL service area" in result["result"]) == (city in NPCL_AREAS)
     
-    def test_weather_data_completeness(self):
+    @pytest.mark.parametrize("city", [
+        "Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata",
+        "Hyderabad", "Pune", "Ahmedabad", "Jaipur", "Lucknow"
+    ])
+    def test_weather_data_completeness(self, tool, city):
         """Test that all major Indian cities have weather data"""
-        tool = WeatherTool()
+        assert tool.is_city_supported(city), f"Major city {city} not supported"
         
-        major_cities = [
-            "Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata",
-            "Hyderabad", "Pune", "Ahmedabad", "Jaipur", "Lucknow"
-        ]
-        
-        for city in major_cities:
-            assert tool.is_city_supported(city), f"Major city {city} not supported"
-            
-            # Test weather data retrieval
-            weather_data = tool._get_weather_data(city)
-            assert len(weather_data) == 4
-            assert "°C" in weather_data[0]  # Temperature
-            assert "%" in weather_data[2]   # Humidity
+        # Test weather data retrieval
+        weather_data = tool._get_weather_data(city)
+        assert len(weather_data) == 4
+        assert "°C" in weather_data[0]  # Temperature
+        assert "%" in weather_data[2]   # Humidity
 
 
 if __name__ == "__main__":
@@ -2,12 +2,148 @@
 Audio test data generator for creating various audio samples.
 """
 
+import functools
 import numpy as np
-import struct
-import wave
-import io
-from typing import Tuple, Optional
-from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Shared PCG64 generator for noise; faster than the legacy global RandomState
+_RNG = np.random.default_rng(0xC0FFEE)
+
+# Zero buffers keyed by byte length, shared by every duration/rate pair that
+# yields the same size
+_SILENCE_CACHE: Dict[int, bytes] = {}
+
+# Generated buffers are immutable bytes, so identical requests can share one
+# cached result instead of re-running the trig/exp math on every call.
+
+def _tone(frequency: float, samples: int, sample_rate: int) -> np.ndarray:
+    """Unit float32 sine at frequency, computed from the sample index.
+    
+    The phase stays float64 (float32 drifts audibly on multi-second tones);
+    only the result is stored as float32, which is plenty for 16-bit PCM.
+    """
+    phase = np.arange(samples, dtype=np.float64)
+    phase *= 2 * np.pi * frequency / sample_rate
+    return np.sin(phase, out=np.empty(samples, dtype=np.float32))
+
+
+@functools.lru_cache(maxsize=256)
+def _sine_wave(frequency: float, duration_ms: int, sample_rate: int, amplitude: float) -> bytes:
+    """Cached sine wave rendering for AudioGenerator.generate_sine_wave."""
+    samples = int(sample_rate * duration_ms / 1000.0)
+    
+    wave_data = _tone(frequency, samples, sample_rate)
+    wave_data *= amplitude
+    
+    # Convert to 16-bit signed integers
+    audio_data = (wave_data * 32767).astype(np.int16)
+    return audio_data.tobytes()
+
+
+@functools.lru_cache(maxsize=256)
+def _white_noise(duration_ms: int, sample_rate: int, amplitude: float, seed: int) -> bytes:
+    """Cached seeded white noise for AudioGenerator.generate_white_noise."""
+    samples = int(sample_rate * duration_ms / 1000.0)
+    noise = np.random.default_rng(seed).standard_normal(samples, dtype=np.float32)
+    noise *= amplitude
+    audio_data = (noise * 32767).astype(np.int16)
+    return audio_data.tobytes()
+
+
+@functools.lru_cache(maxsize=32)
+def _speech_envelope(samples: int, sample_rate: int) -> np.ndarray:
+    """Cached speech amplitude envelope (slow decay with a 1.5 Hz wobble)."""
+    t = np.arange(samples, dtype=np.float32)
+    t /= sample_rate
+    envelope = np.exp(-t * 0.1) * (1 + 0.1 * _tone(1.5, samples, sample_rate))
+    envelope.setflags(write=False)
+    return envelope
+
+
+@functools.lru_cache(maxsize=256)
+def _speech_formants(duration_ms: int, sample_rate: int) -> np.ndarray:
+    """Cached noise-free speech-like waveform (formants times envelope)."""
+    samples = int(sample_rate * duration_ms / 1000.0)
+    
+    # Mix multiple frequencies to simulate speech with very high amplitudes
+    frequencies = [200, 400, 800, 1600]  # Typical speech formants
+    amplitudes = [0.6, 0.5, 0.4, 0.35]  # Very high amplitudes for reliable detection
+    
+    wave_data = np.zeros(samples, dtype=np.float32)
+    for freq, amp in zip(frequencies, amplitudes):
+        formant = _tone(freq, samples, sample_rate)
+        formant *= amp
+        wave_data += formant
+    
+    # Add some envelope to make it more speech-like (very minimal decay)
+    wave_data *= _speech_envelope(samples, sample_rate)
+    
+    # Shared between callers, so never hand out a writable view
+    wave_data.setflags(write=False)
+    return wave_data
+
+
+# DTMF keypad: digit -> (row frequency, column frequency)
+_DTMF_FREQS = {
+    '1': (697, 1209), '2': (697, 1336), '3': (697, 1477),
+    '4': (770, 1209), '5': (770, 1336), '6': (770, 1477),
+    '7': (852, 1209), '8': (852, 1336), '9': (852, 1477),
+    '*': (941, 1209), '0': (941, 1336), '#': (941, 1477)
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _dtmf_component(frequency: float, samples: int, sample_rate: int) -> np.ndarray:
+    """Cached half-scale sine for one DTMF row/column frequency."""
+    component = _tone(frequency, samples, sample_rate)
+    component *= 0.5 * 32767
+    component.setflags(write=False)
+    return component
+
+
+@functools.lru_cache(maxsize=256)
+def _dtmf_tone(freq1: float, freq2: float, duration_ms: int, sample_rate: int) -> bytes:
+    """Cached dual-tone rendering for AudioGenerator.generate_dtmf_tone."""
+    samples = int(sample_rate * duration_ms / 1000.0)
+    
+    wave_data = _dtmf_component(freq1, samples, sample_rate) + _dtmf_component(freq2, samples, sample_rate)
+    
+    audio_data = wave_data.astype(np.int16)
+    return audio_data.tobytes()
+
+
+@functools.lru_cache(maxsize=256)
+def _varying_amplitude(duration_ms: int, sample_rate: int, base_frequency: float) -> bytes:
+    """Cached rendering for AudioGenerator.generate_varying_amplitude."""
+    samples = int(sample_rate * duration_ms / 1000.0)
+    
+    # Create amplitude envelope that varies over time
+    amplitude_envelope = 0.1 + 0.4 * (1 + _tone(2, samples, sample_rate))
+    
+    # Generate base tone
+    wave_data = _tone(base_frequency, samples, sample_rate)
+    wave_data *= amplitude_envelope
+    
+    audio_data = (wave_data * 32767).astype(np.int16)
+    return audio_data.tobytes()
+
+
+_WAV_HEADER_SIZE = 44
+
+
+def _wav_header(data_size: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """Canonical 44-byte PCM header: RIFF chunk, fmt subchunk, data subchunk."""
+    import struct  # Only WAV output needs it; keeps module import lean
+    
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, 8 * sample_width,
+        b'data', data_size
+    )
 
 
 class AudioGenerator:
@@ -21,31 +157,36 @@ class AudioGenerator:
         amplitude: float = 0.5
     ) -> bytes:
         """Generate a sine wave audio sample."""
-        duration_s = duration_ms / 1000.0
-        samples = int(sample_rate * duration_s)
-        
-        t = np.linspace(0, duration_s, samples, False)
-        wave_data = amplitude * np.sin(2 * np.pi * frequency * t)
-        
-        # Convert to 16-bit signed integers
-        audio_data = (wave_data * 32767).astype(np.int16)
-        return audio_data.tobytes()
+        return _sine_wave(frequency, duration_ms, sample_rate, amplitude)
     
     @staticmethod
     def generate_silence(duration_ms: int = 20, sample_rate: int = 16000) -> bytes:
         """Generate silence audio sample."""
         samples = int(sample_rate * duration_ms / 1000.0)
-        return b'\x00' * (samples * 2)  # 2 bytes per 16-bit sample
+        nbytes = samples * 2  # 2 bytes per 16-bit sample
+        
+        silence = _SILENCE_CACHE.get(nbytes)
+        if silence is None:
+            silence = _SILENCE_CACHE[nbytes] = bytes(nbytes)
+        return silence
     
     @staticmethod
     def generate_white_noise(
         duration_ms: int = 20,
         sample_rate: int = 16000,
-        amplitude: float = 0.1
+        amplitude: float = 0.1,
+        seed: Optional[int] = None
     ) -> bytes:
-        """Generate white noise audio sample."""
+        """Generate white noise audio sample.
+        
+        Passing a seed makes the output reproducible and lets it be cached.
+        """
+        if seed is not None:
+            return _white_noise(duration_ms, sample_rate, amplitude, seed)
+        
         samples = int(sample_rate * duration_ms / 1000.0)
-        noise = np.random.normal(0, amplitude, samples)
+        noise = _RNG.standard_normal(samples, dtype=np.float32)
+        noise *= amplitude
         audio_data = (noise * 32767).astype(np.int16)
         return audio_data.tobytes()
     
@@ -55,32 +196,21 @@ class AudioGenerator:
         sample_rate: int = 16000
     ) -> bytes:
         """Generate speech-like audio with varying frequencies."""
-        duration_s = duration_ms / 1000.0
-        samples = int(sample_rate * duration_s)
+        formants = _speech_formants(duration_ms, sample_rate)
         
-        t = np.linspace(0, duration_s, samples, False)
-        
-        # Mix multiple frequencies to simulate speech with very high amplitudes
-        frequencies = [200, 400, 800, 1600]  # Typical speech formants
-        amplitudes = [0.6, 0.5, 0.4, 0.35]  # Very high amplitudes for reliable detection
-        
-        wave_data = np.zeros(samples)
-        for freq, amp in zip(frequencies, amplitudes):
-            wave_data += amp * np.sin(2 * np.pi * freq * t)
-        
-        # Add some envelope to make it more speech-like (very minimal decay)
-        envelope = np.exp(-t * 0.1) * (1 + 0.1 * np.sin(2 * np.pi * 1.5 * t))
-        wave_data *= envelope
-        
-        # Add some noise
-        noise = np.random.normal(0, 0.02, samples)
-        wave_data += noise
+        # Add some noise (fresh per call, only the formants are cached); the
+        # noise draw doubles as the single scratch buffer for the steps below
+        wave_data = _RNG.standard_normal(formants.size, dtype=np.float32)
+        wave_data *= 0.02
+        wave_data += formants
         
         # Ensure high amplitude for detection
-        wave_data = np.clip(wave_data, -0.9, 0.9)  # Use more of the range
+        np.clip(wave_data, -0.9, 0.9, out=wave_data)  # Use more of the range
         
-        # Convert to 16-bit with maximum scaling for detection
-        audio_data = (wave_data * 32767 * 0.95).astype(np.int16)  # Scale to 95% of max
+        # Convert to 16-bit with maximum scaling for detection; the clip above
+        # bounds the result, so scaling can write the int16 output directly
+        audio_data = np.empty(wave_data.size, dtype=np.int16)
+        np.multiply(wave_data, 32767 * 0.95, out=audio_data, casting='unsafe')  # Scale to 95% of max
         return audio_data.tobytes()
     
     @staticmethod
@@ -90,28 +220,11 @@ class AudioGenerator:
         sample_rate: int = 16000
     ) -> bytes:
         """Generate DTMF tone for a digit."""
-        dtmf_freqs = {
-            '1': (697, 1209), '2': (697, 1336), '3': (697, 1477),
-            '4': (770, 1209), '5': (770, 1336), '6': (770, 1477),
-            '7': (852, 1209), '8': (852, 1336), '9': (852, 1477),
-            '*': (941, 1209), '0': (941, 1336), '#': (941, 1477)
-        }
-        
-        if digit not in dtmf_freqs:
+        if digit not in _DTMF_FREQS:
             raise ValueError(f"Invalid DTMF digit: {digit}")
         
-        freq1, freq2 = dtmf_freqs[digit]
-        duration_s = duration_ms / 1000.0
-        samples = int(sample_rate * duration_s)
-        
-        t = np.linspace(0, duration_s, samples, False)
-        wave_data = (
-            0.5 * np.sin(2 * np.pi * freq1 * t) +
-            0.5 * np.sin(2 * np.pi * freq2 * t)
-        )
-        
-        audio_data = (wave_data * 32767).astype(np.int16)
-        return audio_data.tobytes()
+        freq1, freq2 = _DTMF_FREQS[digit]
+        return _dtmf_tone(freq1, freq2, duration_ms, sample_rate)
     
     @staticmethod
     def generate_varying_amplitude(
@@ -120,19 +233,7 @@ class AudioGenerator:
         base_frequency: float = 440.0
     ) -> bytes:
         """Generate audio with varying amplitude for VAD testing."""
-        duration_s = duration_ms / 1000.0
-        samples = int(sample_rate * duration_s)
-        
-        t = np.linspace(0, duration_s, samples, False)
-        
-        # Create amplitude envelope that varies over time
-        amplitude_envelope = 0.1 + 0.4 * (1 + np.sin(2 * np.pi * 2 * t))
-        
-        # Generate base tone
-        wave_data = amplitude_envelope * np.sin(2 * np.pi * base_frequency * t)
-        
-        audio_data = (wave_data * 32767).astype(np.int16)
-        return audio_data.tobytes()
+        return _varying_amplitude(duration_ms, sample_rate, base_frequency)
     
     @staticmethod
     def create_wav_file(
@@ -142,15 +243,34 @@ class AudioGenerator:
         sample_width: int = 2
     ) -> bytes:
         """Create a WAV file from raw audio data."""
-        buffer = io.BytesIO()
-        
-        with wave.open(buffer, 'wb') as wav_file:
-            wav_file.setnchannels(channels)
-            wav_file.setsampwidth(sample_width)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(audio_data)
-        
-        return buffer.getvalue()
+        return _wav_header(len(audio_data), sample_rate, channels, sample_width) + audio_data
+    
+    @staticmethod
+    def create_wav_files_batch(
+        payloads: List[bytes],
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2
+    ) -> List[memoryview]:
+        """Create several WAV files in one shared buffer.
+        
+        Returns read-only memoryview slices (one per payload) into a single
+        preallocated buffer; call bytes() on a slice if a copy is needed.
+        """
+        buffer = bytearray(sum(_WAV_HEADER_SIZE + len(p) for p in payloads))
+        view = memoryview(buffer)
+        files = []
+        offset = 0
+        
+        for payload in payloads:
+            data_start = offset + _WAV_HEADER_SIZE
+            end = data_start + len(payload)
+            buffer[offset:data_start] = _wav_header(len(payload), sample_rate, channels, sample_width)
+            buffer[data_start:end] = payload
+            files.append(view[offset:end].toreadonly())
+            offset = end
+        
+        return files
     
     @staticmethod
     def validate_audio_format(
@@ -171,8 +291,10 @@ class AudioGenerator:
         # Convert bytes to numpy array
         samples = np.frombuffer(audio_data, dtype=np.int16)
         
-        # Calculate RMS
-        rms = np.sqrt(np.mean(samples.astype(np.float32) ** 2))
+        # Calculate RMS from an exact integer sum of squares; int64 because a
+        # single full-scale int16 square already fills most of an int32
+        widened = samples.astype(np.int64)
+        rms = np.sqrt(np.dot(widened, widened) / widened.size)
         return float(rms)
     
     @staticmethod
@@ -181,6 +303,18 @@ class AudioGenerator:
         threshold: float = 100.0
     ) -> bool:
         """Detect if audio data contains silence."""
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if samples.size == 0:
+            return True
+        
+        # RMS is bounded by peak / sqrt(n) <= rms <= peak, so the peak alone
+        # settles most buffers (min() widened to avoid abs(-32768) overflow)
+        peak = max(int(samples.max()), -int(samples.min()))
+        if peak < threshold:
+            return True
+        if peak >= threshold * np.sqrt(samples.size):
+            return False
+        
         energy = AudioGenerator.calculate_rms_energy(audio_data)
         return energy < threshold
     
@@ -192,23 +326,27 @@ class AudioGenerator:
         ratio2: float = 0.5
     ) -> bytes:
         """Mix two audio samples."""
-        # Ensure both audio samples are the same length
-        min_len = min(len(audio1), len(audio2))
-        audio1 = audio1[:min_len]
-        audio2 = audio2[:min_len]
+        # Ensure both audio samples are the same length (views, no byte copies)
+        count = min(len(audio1), len(audio2)) // 2
+        samples1 = np.frombuffer(audio1, dtype=np.int16, count=count)
+        samples2 = np.frombuffer(audio2, dtype=np.int16, count=count)
         
-        # Convert to numpy arrays
-        samples1 = np.frombuffer(audio1, dtype=np.int16).astype(np.float32)
-        samples2 = np.frombuffer(audio2, dtype=np.int16).astype(np.float32)
+        # Mix with specified ratios as Q15 fixed-point coefficients; int32
+        # holds the sum whenever the ratios add up to at most unity
+        q15_1 = int(round(ratio1 * 32768))
+        q15_2 = int(round(ratio2 * 32768))
+        acc_dtype = np.int32 if abs(ratio1) + abs(ratio2) <= 1.0 else np.int64
         
-        # Mix with specified ratios
-        mixed = ratio1 * samples1 + ratio2 * samples2
+        mixed = np.multiply(samples1, q15_1, dtype=acc_dtype)
+        mixed += np.multiply(samples2, q15_2, dtype=acc_dtype)
+        mixed >>= 15
         
-        # Clip to prevent overflow
-        mixed = np.clip(mixed, -32768, 32767)
+        # Clip to prevent overflow, saturating straight into the int16 output
+        audio_data = np.empty(count, dtype=np.int16)
+        np.clip(mixed, -32768, 32767, out=audio_data, casting='unsafe')
         
         # Convert back to bytes
-        return mixed.astype(np.int16).tobytes()
+        return audio_data.tobytes()
 
 
 class AudioTestPatterns:
@@ -235,30 +373,38 @@ class AudioTestPatterns:
     @staticmethod
     def varying_volume_speech() -> bytes:
         """Generate speech with varying volume levels."""
-        patterns = []
-        volumes = [0.1, 0.3, 0.5, 0.7, 0.9]
+        volumes = np.array([0.1, 0.3, 0.5, 0.7, 0.9], dtype=np.float32)
         
-        for volume in volumes:
-            speech = AudioGenerator.generate_speech_like(500)
-            # Adjust volume
-            samples = np.frombuffer(speech, dtype=np.int16).astype(np.float32)
-            samples *= volume
-            patterns.append(samples.astype(np.int16).tobytes())
+        speech = AudioGenerator.generate_speech_like(500)
+        base = np.frombuffer(speech, dtype=np.int16)
         
-        return b''.join(patterns)
+        # One row per volume; row-major flattening concatenates the segments.
+        # The int16 view is promoted inside the multiply, no separate copy.
+        scaled = np.multiply(base[None, :], volumes[:, None], dtype=np.float32)
+        return scaled.astype(np.int16).tobytes()
     
     @staticmethod
     def dtmf_sequence() -> bytes:
         """Generate DTMF sequence for testing."""
         digits = ['1', '2', '3', '4', '5']
-        patterns = []
-        
-        for digit in digits:
-            dtmf = AudioGenerator.generate_dtmf_tone(digit, 200)
-            silence = AudioGenerator.generate_silence(100)
-            patterns.extend([dtmf, silence])
-        
-        return b''.join(patterns)
+        sample_rate = 16000
+        tone_samples = int(sample_rate * 200 / 1000.0)  # 200ms tone
+        slot_samples = tone_samples + int(sample_rate * 100 / 1000.0)  # + 100ms silence
+        
+        # Zero-initialised, so only the tone slices need writing
+        sequence = np.zeros(len(digits) * slot_samples, dtype=np.int16)
+        
+        for index, digit in enumerate(digits):
+            freq1, freq2 = _DTMF_FREQS[digit]
+            offset = index * slot_samples
+            np.add(
+                _dtmf_component(freq1, tone_samples, sample_rate),
+                _dtmf_component(freq2, tone_samples, sample_rate),
+                out=sequence[offset:offset + tone_samples],
+                casting='unsafe'
+            )
+        
+        return sequence.tobytes()
     
     @staticmethod
     def noise_with_speech() -> bytes:
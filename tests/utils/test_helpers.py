@@ -2,33 +2,76 @@
 Test helper functions and utilities.
 """
 
+import array
 import asyncio
+import functools
+import logging
 import time
+from collections import Counter, defaultdict
+import numpy as np
 import psutil
+import signal
 import threading
-from typing import Any, Dict, List, Optional, Callable, Awaitable
+from typing import Any, Dict, List, Optional, Callable, Awaitable, Union
 from unittest.mock import Mock, AsyncMock
 import json
 import base64
 
+# orjson is optional; fall back to the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(event: Dict[str, Any]) -> bytes:
+    """Serialize an event to compact JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(event)
+    return json.dumps(event, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
 
 class PerformanceMonitor:
     """Monitor performance metrics during tests."""
     
-    def __init__(self):
+    def __init__(self, store_history: bool = False):
         self.start_time = None
         self.end_time = None
-        self.memory_usage = []
-        self.cpu_usage = []
+        self.store_history = store_history  # Keep every sample, not just the aggregates
+        self.memory_usage = array.array('d')  # Contiguous C doubles, no boxing
+        self.cpu_usage = array.array('d')
         self.monitoring = False
         self.monitor_thread = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._prev_alarm: Optional[Dict[str, Any]] = None
+        self._stop_event = threading.Event()
+        self._reset_aggregates()
+    
+    def _reset_aggregates(self):
+        """Reset the running peak/sum/count of each metric."""
+        self._mem_peak = 0.0
+        self._mem_sum = 0.0
+        self._mem_n = 0
+        self._cpu_peak = 0.0
+        self._cpu_sum = 0.0
+        self._cpu_n = 0
+    
+    def _begin(self):
+        """Reset state shared by the thread and asyncio samplers."""
+        self.start_time = time.monotonic()
+        self.monitoring = True
+        self.memory_usage = array.array('d')
+        self.cpu_usage = array.array('d')
+        self._reset_aggregates()
     
     def start_monitoring(self):
         """Start performance monitoring."""
-        self.start_time = time.time()
-        self.monitoring = True
-        self.memory_usage = []
-        self.cpu_usage = []
+        self._begin()
+        self._stop_event.clear()
         
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
@@ -37,39 +80,173 @@ class PerformanceMonitor:
     def stop_monitoring(self):
         """Stop performance monitoring."""
         self.monitoring = False
-        self.end_time = time.time()
+        self.end_time = time.monotonic()
+        self._stop_event.set()  # Wake the sampler instead of waiting out its sleep
         
         if self.monitor_thread:
             self.monitor_thread.join(timeout=1.0)
     
-    def _monitor_loop(self):
-        """Monitor loop running in separate thread."""
-        process = psutil.Process()
+    async def start_monitoring_async(self):
+        """Start performance monitoring as a task on the running event loop."""
+        self._begin()
+        self._monitor_task = asyncio.create_task(self._monitor_async())
+    
+    async def stop_monitoring_async(self):
+        """Stop monitoring started with start_monitoring_async."""
+        self.monitoring = False
+        self.end_time = time.monotonic()
         
-        while self.monitoring:
+        task, self._monitor_task = self._monitor_task, None
+        if task:
+            task.cancel()  # Don't wait out the sampler's sleep
             try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    def start_monitoring_itimer(self, interval_s: float = 0.01):
+        """Start monitoring driven by SIGALRM from an interval timer.
+        
+        Kernel timers keep a much steadier cadence than a sleeping thread, so
+        this suits high-rate sampling. Python only runs signal handlers in the
+        main thread, and SIGALRM is Unix-only, so this mode is meant for
+        single-threaded benchmarks started from the main thread. Samples are
+        taken between bytecodes of whatever the main thread is running.
+        
+        ITIMER_REAL is shared with anything else using SIGALRM, notably
+        pytest-timeout's signal method. A timer that is already armed is taken
+        over, not lost: its handler is still called once its deadline passes,
+        and stop_monitoring_itimer() re-arms it with the time it has left.
+        """
+        self._begin()
+        sample = self._make_sampler()
+        
+        def on_alarm(signum, frame):
+            prev = self._prev_alarm
+            if prev is not None and prev["deadline"] is not None:
+                if time.monotonic() >= prev["deadline"]:
+                    interval = prev["interval"]
+                    prev["deadline"] = prev["deadline"] + interval if interval else None
+                    if callable(prev["handler"]):
+                        prev["handler"](signum, frame)
+            
+            if self.monitoring:
+                try:
+                    sample()
+                except Exception:
+                    self.monitoring = False
+        
+        # Block SIGALRM while swapping handler and timer so neither fires half-way
+        # (signal.signal() raises ValueError outside the main thread)
+        old_mask = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        try:
+            handler = signal.signal(signal.SIGALRM, on_alarm)
+            delay, interval = signal.setitimer(signal.ITIMER_REAL, interval_s, interval_s)
+            self._prev_alarm = {
+                "handler": handler,
+                "deadline": time.monotonic() + delay if delay else None,
+                "interval": interval
+            }
+        finally:
+            signal.pthread_sigmask(signal.SIG_SETMASK, old_mask)
+    
+    def stop_monitoring_itimer(self):
+        """Stop monitoring started with start_monitoring_itimer.
+        
+        Restores the previous SIGALRM handler and re-arms any timer that was
+        running before monitoring started.
+        """
+        self.monitoring = False
+        self.end_time = time.monotonic()
+        
+        prev, self._prev_alarm = self._prev_alarm, None
+        if prev is None:
+            return
+        
+        old_mask = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            if prev["handler"] is not None:
+                signal.signal(signal.SIGALRM, prev["handler"])
+            
+            if prev["deadline"] is not None:
+                # A delay of 0 would disarm the timer; an overdue one fires at once
+                remaining = max(prev["deadline"] - time.monotonic(), 1e-6)
+                signal.setitimer(signal.ITIMER_REAL, remaining, prev["interval"])
+        finally:
+            signal.pthread_sigmask(signal.SIG_SETMASK, old_mask)
+    
+    def _make_sampler(self) -> Callable[[], None]:
+        """Build a function that takes one sample and folds it into the metrics."""
+        process = psutil.Process()
+        oneshot = process.oneshot
+        memory_info = process.memory_info
+        cpu_percent = process.cpu_percent
+        store_history = self.store_history
+        
+        def sample():
+            # One /proc read serves both lookups
+            with oneshot():
                 # Memory usage in MB
-                memory_mb = process.memory_info().rss / 1024 / 1024
-                self.memory_usage.append(memory_mb)
+                memory_mb = memory_info().rss / 1024 / 1024
                 
                 # CPU usage percentage
-                cpu_percent = process.cpu_percent()
-                self.cpu_usage.append(cpu_percent)
-                
-                time.sleep(0.1)  # Sample every 100ms
+                cpu = cpu_percent()
+            
+            # Streaming aggregates keep get_metrics() O(1)
+            if memory_mb > self._mem_peak:
+                self._mem_peak = memory_mb
+            self._mem_sum += memory_mb
+            self._mem_n += 1
+            
+            if cpu > self._cpu_peak:
+                self._cpu_peak = cpu
+            self._cpu_sum += cpu
+            self._cpu_n += 1
+            
+            if store_history:
+                self.memory_usage.append(memory_mb)
+                self.cpu_usage.append(cpu)
+        
+        return sample
+    
+    def _monitor_loop(self):
+        """Monitor loop running in separate thread."""
+        sample = self._make_sampler()
+        stop_event = self._stop_event
+        
+        while self.monitoring:
+            try:
+                sample()
+                stop_event.wait(0.1)  # Sample every 100ms
+            except Exception:
+                break
+    
+    async def _monitor_async(self):
+        """Monitor loop running as an asyncio task (no extra thread)."""
+        sample = self._make_sampler()
+        
+        while self.monitoring:
+            try:
+                sample()  # A /proc read, cheap enough to run on the loop
             except Exception:
                 break
+            await asyncio.sleep(0.1)  # Sample every 100ms
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics."""
-        duration = (self.end_time or time.time()) - (self.start_time or time.time())
+        now = time.monotonic()
+        duration = (self.end_time or now) - (self.start_time or now)
+        
+        mem_n = self._mem_n
+        cpu_n = self._cpu_n
         
         return {
             "duration_seconds": duration,
-            "peak_memory_mb": max(self.memory_usage) if self.memory_usage else 0,
-            "avg_memory_mb": sum(self.memory_usage) / len(self.memory_usage) if self.memory_usage else 0,
-            "peak_cpu_percent": max(self.cpu_usage) if self.cpu_usage else 0,
-            "avg_cpu_percent": sum(self.cpu_usage) / len(self.cpu_usage) if self.cpu_usage else 0
+            "peak_memory_mb": self._mem_peak if mem_n else 0,
+            "avg_memory_mb": self._mem_sum / mem_n if mem_n else 0,
+            "peak_cpu_percent": self._cpu_peak if cpu_n else 0,
+            "avg_cpu_percent": self._cpu_sum / cpu_n if cpu_n else 0
         }
 
 
@@ -80,12 +257,22 @@ class AsyncTestHelper:
     async def wait_for_condition(
         condition: Callable[[], bool],
         timeout: float = 5.0,
-        interval: float = 0.1
+        interval: float = 0.1,
+        source: Optional["_MockEventSource"] = None
     ) -> bool:
-        """Wait for a condition to become true."""
-        start_time = time.time()
+        """Wait for a condition to become true.
+        
+        If a mock event source is given (e.g. a MockAsteriskARI), the condition
+        is re-checked after each event it dispatches instead of polling every
+        interval.
+        """
+        if source is not None:
+            return await AsyncTestHelper._wait_for_source(condition, source, timeout)
+        
+        monotonic = time.monotonic  # Local lookup inside the loop
+        deadline = monotonic() + timeout
         
-        while time.time() - start_time < timeout:
+        while monotonic() < deadline:
             if condition():
                 return True
             await asyncio.sleep(interval)
@@ -96,18 +283,59 @@ class AsyncTestHelper:
     async def wait_for_async_condition(
         condition: Callable[[], Awaitable[bool]],
         timeout: float = 5.0,
-        interval: float = 0.1
+        interval: float = 0.1,
+        source: Optional["_MockEventSource"] = None
     ) -> bool:
-        """Wait for an async condition to become true."""
-        start_time = time.time()
+        """Wait for an async condition to become true.
         
-        while time.time() - start_time < timeout:
+        Accepts an optional event source with the same meaning as in
+        wait_for_condition.
+        """
+        if source is not None:
+            return await AsyncTestHelper._wait_for_source(condition, source, timeout)
+        
+        monotonic = time.monotonic  # Local lookup inside the loop
+        deadline = monotonic() + timeout
+        
+        while monotonic() < deadline:
             if await condition():
                 return True
             await asyncio.sleep(interval)
         
         return False
     
+    @staticmethod
+    async def _wait_for_source(
+        condition: Callable[[], Any],
+        source: "_MockEventSource",
+        timeout: float
+    ) -> bool:
+        """Re-check condition (sync or async) after each event source dispatches."""
+        async def check() -> bool:
+            result = condition()
+            if asyncio.iscoroutine(result):
+                result = await result
+            return bool(result)
+        
+        monotonic = time.monotonic
+        deadline = monotonic() + timeout
+        
+        while True:
+            # Read before checking: an async condition can suspend, and an event
+            # dispatched meanwhile must still end the wait below
+            seen = source.events_sent
+            if await check():
+                return True
+            
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return False
+            
+            try:
+                await asyncio.wait_for(source.wait_for_dispatch(seen), timeout=remaining)
+            except asyncio.TimeoutError:
+                return await check()
+    
     @staticmethod
     async def run_with_timeout(
         coro: Awaitable[Any],
@@ -124,7 +352,7 @@ class MockWebSocketServer:
         self.host = host
         self.port = port
         self.server = None
-        self.connections = []
+        self.connections: set = set()
         self.message_handlers = {}
         self.connection_handlers = []
     
@@ -146,22 +374,23 @@ class MockWebSocketServer:
     
     async def _handle_connection(self, websocket, path):
         """Handle new WebSocket connection."""
-        self.connections.append(websocket)
+        self.connections.add(websocket)
         
         # Notify connection handlers
         for handler in self.connection_handlers:
             await handler(websocket, path)
         
+        from websockets.exceptions import ConnectionClosed
+        
         try:
             async for message in websocket:
                 # Handle message based on path
                 if path in self.message_handlers:
                     await self.message_handlers[path](websocket, message)
-        except Exception:
-            pass
+        except ConnectionClosed:
+            pass  # Peer went away mid-read; handler bugs still propagate
         finally:
-            if websocket in self.connections:
-                self.connections.remove(websocket)
+            self.connections.discard(websocket)
     
     def add_message_handler(self, path: str, handler: Callable):
         """Add message handler for specific path."""
@@ -173,105 +402,169 @@ class MockWebSocketServer:
     
     async def broadcast(self, message: Any):
         """Broadcast message to all connections."""
-        if self.connections:
-            await asyncio.gather(
-                *[conn.send(message) for conn in self.connections],
-                return_exceptions=True
-            )
+        # Snapshot: connections may close (and be discarded) mid-broadcast
+        connections = tuple(self.connections)
+        if not connections:
+            return
+        
+        if len(connections) == 1:
+            # Fast path: no gather wrapper for a single peer
+            await self._send_quietly(connections[0], message)
+            return
+        
+        # Failures are swallowed per send so one dead peer can't stop the rest
+        await asyncio.gather(*[self._send_quietly(conn, message) for conn in connections])
+    
+    @staticmethod
+    async def _send_quietly(conn, message: Any):
+        """Send to one connection, ignoring errors (closed peers etc.)."""
+        try:
+            await conn.send(message)
+        except Exception:
+            pass
 
 
-class MockAsteriskARI:
-    """Mock Asterisk ARI server for testing."""
+class _MockEventSource:
+    """Event handler registry and dispatch shared by the mock APIs."""
     
     def __init__(self):
-        self.channels = {}
-        self.bridges = {}
-        self.recordings = {}
-        self.event_handlers = []
+        self.event_handlers = []  # (handler, is_async) pairs in registration order
+        self._encoded_handlers = []  # (handler, is_async) pairs fed JSON bytes
+        self.events_sent = 0  # Dispatch count waiters compare against
+        self._sent_condition: Optional[asyncio.Condition] = None
+    
+    async def wait_for_dispatch(self, seen: int):
+        """Wait until events_sent has moved on from the value seen.
+        
+        Returns at once if an event was dispatched since seen was read, so
+        nothing is missed while the caller was busy, and waiters never reset
+        state that other waiters rely on.
+        """
+        if self._sent_condition is None:
+            # Created on first use: before Python 3.10 a Condition binds to the
+            # loop current at construction, which for a mock built in a sync
+            # fixture is not the loop the test runs on
+            self._sent_condition = asyncio.Condition()
+        
+        async with self._sent_condition:
+            await self._sent_condition.wait_for(lambda: self.events_sent != seen)
     
     def add_event_handler(self, handler: Callable):
-        """Add event handler."""
-        self.event_handlers.append(handler)
+        """Add event handler (classified as sync/async once, here)."""
+        self.event_handlers.append((handler, asyncio.iscoroutinefunction(handler)))
+    
+    def add_encoded_event_handler(self, handler: Callable):
+        """Add a handler that receives each event as serialized JSON bytes.
+        
+        Encoded handlers run after every handler added with add_event_handler,
+        whatever order the two kinds were registered in, and in registration
+        order among themselves. The payload is compact UTF-8 JSON; orjson and
+        the stdlib fallback may format it differently (e.g. floats), so decode
+        it rather than comparing bytes.
+        """
+        self._encoded_handlers.append((handler, asyncio.iscoroutinefunction(handler)))
+    
+    @staticmethod
+    async def _call_handler(handler: Callable, is_async: bool, arg: Any):
+        """Run one handler; a failing handler must not stop the dispatch."""
+        try:
+            if is_async:
+                await handler(arg)
+            else:
+                handler(arg)
+        except Exception:
+            logger.debug("Mock event handler %r failed", handler, exc_info=True)
     
     async def send_event(self, event: Dict[str, Any]):
-        """Send event to all handlers."""
-        for handler in self.event_handlers:
-            try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
-            except Exception:
-                pass
+        """Send event to all handlers in registration order, then encoded ones."""
+        for handler, is_async in self.event_handlers:
+            await self._call_handler(handler, is_async, event)
+        
+        if self._encoded_handlers:
+            # Serialize once, however many wire-level handlers there are
+            payload = _encode(event)
+            for handler, is_async in self._encoded_handlers:
+                await self._call_handler(handler, is_async, payload)
+        
+        self.events_sent += 1
+        if self._sent_condition is not None:  # Nobody waiting yet, nothing to wake
+            async with self._sent_condition:
+                self._sent_condition.notify_all()
+
+
+class MockAsteriskARI(_MockEventSource):
+    """Mock Asterisk ARI server for testing."""
+    
+    # Static parts of the call-flow events; each event is a shallow merge of
+    # one of these with its per-call channel dict (treat them as read-only)
+    _DIALPLAN = {"context": "gemini-voice-assistant", "exten": "1000"}
+    _STASIS_START_TMPL = {
+        "type": "StasisStart",
+        "application": "gemini-voice-assistant",
+        "timestamp": "2024-01-01T12:00:00.000Z",
+    }
+    _STATE_CHANGE_TMPL = {
+        "type": "ChannelStateChange",
+        "timestamp": "2024-01-01T12:00:01.000Z",
+    }
+    _STASIS_END_TMPL = {
+        "type": "StasisEnd",
+        "application": "gemini-voice-assistant",
+        "timestamp": "2024-01-01T12:01:00.000Z",
+    }
+    
+    def __init__(self, realtime: bool = False):
+        super().__init__()
+        self.realtime = realtime  # Sleep for real between call-flow events
+        self.channels = {}
+        self.bridges = {}
+        self.recordings = {}
     
     async def simulate_call_flow(self, channel_id: str, caller_number: str):
         """Simulate a complete call flow."""
         # StasisStart
-        await self.send_event({
-            "type": "StasisStart",
-            "application": "gemini-voice-assistant",
-            "timestamp": "2024-01-01T12:00:00.000Z",
+        await self.send_event(self._STASIS_START_TMPL | {
             "channel": {
                 "id": channel_id,
                 "name": f"SIP/test-{channel_id}",
                 "state": "Up",
                 "caller": {"number": caller_number, "name": "Test Caller"},
-                "dialplan": {"context": "gemini-voice-assistant", "exten": "1000"}
+                "dialplan": self._DIALPLAN
             }
         })
         
-        # Simulate some delay
-        await asyncio.sleep(0.1)
+        # Simulate some delay (a bare scheduling yield unless realtime)
+        await asyncio.sleep(0.1 if self.realtime else 0)
         
         # ChannelStateChange
-        await self.send_event({
-            "type": "ChannelStateChange",
-            "timestamp": "2024-01-01T12:00:01.000Z",
-            "channel": {
-                "id": channel_id,
-                "state": "Up"
-            }
+        await self.send_event(self._STATE_CHANGE_TMPL | {
+            "channel": {"id": channel_id, "state": "Up"}
         })
         
         # Simulate call duration
-        await asyncio.sleep(1.0)
+        await asyncio.sleep(1.0 if self.realtime else 0)
         
         # StasisEnd
-        await self.send_event({
-            "type": "StasisEnd",
-            "application": "gemini-voice-assistant",
-            "timestamp": "2024-01-01T12:01:00.000Z",
-            "channel": {
-                "id": channel_id,
-                "state": "Down"
-            }
+        await self.send_event(self._STASIS_END_TMPL | {
+            "channel": {"id": channel_id, "state": "Down"}
         })
 
 
-class MockGeminiLiveAPI:
+@functools.lru_cache(maxsize=128)
+def _b64(data: bytes) -> str:
+    """Base64-encode audio, memoized for fixture chunks replayed many times."""
+    return base64.b64encode(data).decode('ascii')  # Base64 alphabet is pure ASCII
+
+
+class MockGeminiLiveAPI(_MockEventSource):
     """Mock Gemini Live API for testing."""
     
     def __init__(self):
+        super().__init__()
         self.session_id = "test-session-123"
         self.response_id = "test-response-123"
-        self.event_handlers = []
         self.audio_buffer = []
     
-    def add_event_handler(self, handler: Callable):
-        """Add event handler."""
-        self.event_handlers.append(handler)
-    
-    async def send_event(self, event: Dict[str, Any]):
-        """Send event to all handlers."""
-        for handler in self.event_handlers:
-            try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
-            except Exception:
-                pass
-    
     async def simulate_session_creation(self):
         """Simulate session creation."""
         await self.send_event({
@@ -290,10 +583,13 @@ class MockGeminiLiveAPI:
             "audio_start_ms" if started else "audio_end_ms": 1000
         })
     
-    async def simulate_audio_response(self, audio_data: bytes):
+    async def simulate_audio_response(self, audio_data: Union[bytes, bytearray, memoryview]):
         """Simulate audio response."""
         # Encode audio as base64
-        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+        if type(audio_data) is bytes:
+            audio_base64 = _b64(audio_data)
+        else:  # bytearray/memoryview are unhashable, or mutable
+            audio_base64 = base64.b64encode(audio_data).decode('ascii')
         
         await self.send_event({
             "type": "response.audio.delta",
@@ -315,6 +611,43 @@ class MockGeminiLiveAPI:
         })
 
 
+def compile_validator(thresholds: Dict[str, float]) -> Callable[[Dict[str, Any]], Dict[str, bool]]:
+    """Build a straight-line checker for a fixed set of performance thresholds.
+    
+    Results keep the thresholds' order. Thresholds that can't key the cache
+    (unhashable values) get the plain loop instead.
+    """
+    items = tuple(thresholds.items())
+    try:
+        return _compile_validator(items)
+    except TypeError:
+        return functools.partial(_check_thresholds, items)
+
+
+def _check_thresholds(items: tuple, metrics: Dict[str, Any]) -> Dict[str, bool]:
+    results = {}
+    for metric, threshold in items:
+        results[metric] = metric in metrics and metrics[metric] <= threshold
+    return results
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_validator(items: tuple) -> Callable[[Dict[str, Any]], Dict[str, bool]]:
+    # Metric names and thresholds are bound as globals of the generated
+    # function rather than inlined via repr(), which would break for values
+    # such as inf/nan or keys that aren't literals
+    namespace = {}
+    lines = ["def check(m):", "    r = {}"]
+    for i, (metric, threshold) in enumerate(items):
+        namespace[f"k{i}"] = metric
+        namespace[f"t{i}"] = threshold
+        lines.append(f"    r[k{i}] = k{i} in m and m[k{i}] <= t{i}")
+    lines.append("    return r")
+    
+    exec("\n".join(lines), namespace)
+    return namespace["check"]
+
+
 class TestDataValidator:
     """Validate test data and results."""
     
@@ -326,13 +659,25 @@ class TestDataValidator:
         tolerance_ms: int = 5
     ) -> bool:
         """Validate audio data duration and format."""
-        expected_samples = int(sample_rate * expected_duration_ms / 1000)
-        expected_bytes = expected_samples * 2  # 16-bit samples
+        return bool(TestDataValidator.validate_audio_batch(
+            len(audio_data), expected_duration_ms, sample_rate, tolerance_ms
+        ))
+    
+    @staticmethod
+    def validate_audio_batch(
+        actual_bytes: np.ndarray,
+        expected_duration_ms: np.ndarray,
+        sample_rate: int = 16000,
+        tolerance_ms: int = 5
+    ) -> np.ndarray:
+        """Validate many clip lengths (in bytes) against expected durations at once."""
+        actual_bytes = np.asarray(actual_bytes, dtype=np.int64)
+        expected_duration_ms = np.asarray(expected_duration_ms)
         
-        actual_bytes = len(audio_data)
-        tolerance_bytes = int(sample_rate * tolerance_ms / 1000) * 2
+        expected_bytes = (sample_rate * expected_duration_ms // 1000) * 2  # 16-bit samples
+        tolerance_bytes = (sample_rate * tolerance_ms // 1000) * 2
         
-        return abs(actual_bytes - expected_bytes) <= tolerance_bytes
+        return np.abs(actual_bytes - expected_bytes) <= tolerance_bytes
     
     @staticmethod
     def validate_session_metrics(metrics: Dict[str, Any]) -> bool:
@@ -350,15 +695,7 @@ class TestDataValidator:
         thresholds: Dict[str, float]
     ) -> Dict[str, bool]:
         """Validate performance metrics against thresholds."""
-        results = {}
-        
-        for metric, threshold in thresholds.items():
-            if metric in metrics:
-                results[metric] = metrics[metric] <= threshold
-            else:
-                results[metric] = False
-        
-        return results
+        return compile_validator(thresholds)(metrics)
 
 
 class EventCollector:
@@ -366,18 +703,21 @@ class EventCollector:
     
     def __init__(self):
         self.events = []
-        self.event_counts = {}
+        self.event_counts: Counter = Counter()
+        self._by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.start_time = None
     
     def start_collecting(self):
         """Start collecting events."""
         self.events = []
-        self.event_counts = {}
-        self.start_time = time.time()
+        self.event_counts: Counter = Counter()
+        self._by_type = defaultdict(list)
+        self.start_time = time.monotonic()
     
     def add_event(self, event_type: str, data: Any = None):
         """Add an event."""
-        timestamp = time.time() - (self.start_time or time.time())
+        now = time.monotonic()
+        timestamp = now - (self.start_time or now)
         
         event = {
             "type": event_type,
@@ -385,21 +725,26 @@ class EventCollector:
             "data": data
         }
         
+        # time.monotonic() never goes backwards, so appending keeps self.events
+        # in chronological order
+        assert not self.events or self.events[-1]["timestamp"] <= timestamp
         self.events.append(event)
-        self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+        self.event_counts[event_type] += 1
+        self._by_type[event_type].append(event)
     
     def get_events_by_type(self, event_type: str) -> List[Dict[str, Any]]:
         """Get events by type."""
-        return [event for event in self.events if event["type"] == event_type]
+        # Copy so callers can't mutate the index
+        return self._by_type.get(event_type, [])[:]
     
     def get_event_timeline(self) -> List[Dict[str, Any]]:
         """Get chronological event timeline."""
-        return sorted(self.events, key=lambda x: x["timestamp"])
+        return list(self.events)  # Already chronological, see add_event
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get event statistics."""
         return {
             "total_events": len(self.events),
-            "event_counts": self.event_counts.copy(),
+            "event_counts": dict(self.event_counts),
             "duration": max([e["timestamp"] for e in self.events]) if self.events else 0
         }
\ No newline at end of file
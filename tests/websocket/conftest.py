@@ -0,0 +1,34 @@
+"""
+WebSocket test configuration.
+"""
+
+import pytest
+
+# uvloop is optional (and unavailable on Windows); without it the tests run on
+# the default asyncio loop
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# pytest-asyncio >= 1.4 replaces the event_loop_policy fixture with a hook
+try:
+    from pytest_asyncio.plugin import PytestAsyncioSpecs
+    LOOP_FACTORY_HOOK = hasattr(PytestAsyncioSpecs, "pytest_asyncio_loop_factories")
+except ImportError:
+    LOOP_FACTORY_HOOK = False
+
+
+# These tests are dominated by event-loop dispatch around mocked sends, which
+# uvloop's C scheduler makes considerably cheaper
+if UVLOOP_AVAILABLE and LOOP_FACTORY_HOOK:
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run the WebSocket tests on libuv's event loop."""
+        return {"uvloop": uvloop.new_event_loop}
+elif UVLOOP_AVAILABLE:
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run the WebSocket tests on libuv's event loop."""
+        return uvloop.EventLoopPolicy()